@@ -5,44 +5,106 @@ This script can be used to automatically fill the complaint form
 Requires selenium and a web driver
 """
 
+import atexit
+import os
+import shutil
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import Select
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Sets a field's value and fires the events a form would see from real typing
+_SET_VALUE_JS = (
+    "arguments[0].value = arguments[1];"
+    "arguments[0].dispatchEvent(new Event('input', {bubbles: true}));"
+    "arguments[0].dispatchEvent(new Event('change', {bubbles: true}));"
+)
+
+# Shared chromedriver process, started on first use and reused by every session
+_chromedriver_service = None
+_chromedriver_lock = threading.Lock()
+
+# How long to wait for the user to solve the CAPTCHA and submit, and what marks success
+_SUBMIT_TIMEOUT = 300
+_SUBMITTED_SELECTOR = "#msg_notice, .success, #thankyou"
+
+def _get_chromedriver_service():
+    """Return the shared chromedriver service, or None if no chromedriver binary is available."""
+    global _chromedriver_service
+    with _chromedriver_lock:
+        if _chromedriver_service is None:
+            driver_path = os.getenv("CHROMEDRIVER_PATH") or shutil.which("chromedriver")
+            if not driver_path:
+                return None
+            service = Service(executable_path=driver_path)
+            service.start()
+            atexit.register(service.stop)
+            _chromedriver_service = service
+        return _chromedriver_service
+
 class ComplaintFormFiller:
     def __init__(self, headless=False):
         """Initialize the browser automation."""
         self.driver = None
         self.headless = headless
+        self._fields_by_name = {}  # name attribute -> WebElement for the current page
         
     def setup_driver(self):
         """Setup Chrome driver with options."""
+        try:
+            self.driver = self.create_driver()
+            return True
+        except Exception as e:
+            logger.error(f"Failed to setup Chrome driver: {e}")
+            return False
+    
+    def create_driver(self):
+        """Create and return a new Chrome session using this filler's options."""
         from selenium.webdriver.chrome.options import Options
         
         chrome_options = Options()
-        if self.headless:
-            chrome_options.add_argument("--headless")
         chrome_options.add_argument("--no-sandbox")
         chrome_options.add_argument("--disable-dev-shm-usage")
+        chrome_options.add_argument("--disable-gpu")
+        chrome_options.add_argument("--disable-extensions")
+        chrome_options.add_argument("--disable-background-networking")
+        chrome_options.add_argument("--disable-renderer-backgrounding")
+        chrome_options.add_argument("--window-size=1280,800")
+        prefs = {"profile.default_content_setting_values.notifications": 2}
+        if self.headless:
+            chrome_options.add_argument("--headless=new")
+            # Nobody looks at a headless page, so skip image downloads and decoding.
+            # Headful runs keep images since the user has to solve the CAPTCHA.
+            chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+            prefs["profile.managed_default_content_settings.images"] = 2
+        chrome_options.add_experimental_option("prefs", prefs)
         
-        try:
-            self.driver = webdriver.Chrome(options=chrome_options)
-            return True
-        except Exception as e:
-            logger.error(f"Failed to setup Chrome driver: {e}")
-            return False
+        service = _get_chromedriver_service()
+        if service:
+            # Only a new browser session is created; the chromedriver process is reused
+            driver = webdriver.Remote(command_executor=service.service_url, options=chrome_options)
+        else:
+            driver = webdriver.Chrome(options=chrome_options)
+        # Explicit WebDriverWaits only; an implicit wait would stack on top of them
+        driver.implicitly_wait(0)
+        return driver
     
-    def fill_complaint_form(self, complaint_data):
+    def fill_complaint_form(self, complaint_data, close_browser=True):
         """
         Fill the complaint form automatically.
         
+        Set close_browser=False to keep the session open for the next form;
+        call close() when done.
+        
         complaint_data should contain:
         {
             'email': 'user@example.com',
@@ -63,9 +125,10 @@ class ComplaintFormFiller:
             self.driver.get("https://grs.ietlucknow.ac.in/open.php")
             
             # Wait for page to load
-            WebDriverWait(self.driver, 10).until(
+            WebDriverWait(self.driver, timeout=10, poll_frequency=0.1).until(
                 EC.presence_of_element_located((By.TAG_NAME, "form"))
             )
+            self._cache_form_fields()
             
             # Fill email field
             self._fill_field_by_name("email", complaint_data.get('email', ''))
@@ -96,42 +159,71 @@ class ComplaintFormFiller:
             
             print("✅ Form filled successfully!")
             print("📝 Please review the form, complete any remaining fields (like CAPTCHA), and submit manually.")
+            print(f"⏳ The browser will close automatically after submission (or after {_SUBMIT_TIMEOUT // 60} minutes).")
             
-            # Keep browser open for user to review and submit
-            input("Press Enter after you've submitted the form to close the browser...")
-            
-            return True
+            # Keep browser open until the user has reviewed and submitted
+            return self._wait_for_submission()
             
         except Exception as e:
             logger.error(f"Error filling form: {e}")
             return False
         finally:
-            if self.driver:
-                self.driver.quit()
+            if close_browser:
+                self.close()
+    
+    def close(self):
+        """End the browser session; the shared chromedriver service keeps running."""
+        if self.driver:
+            self.driver.quit()
+            self.driver = None
+    
+    def _wait_for_submission(self, timeout=_SUBMIT_TIMEOUT):
+        """Wait for the form to be submitted (page changes or a success notice appears)."""
+        form_url = self.driver.current_url
+        try:
+            WebDriverWait(self.driver, timeout=timeout, poll_frequency=0.5).until(
+                lambda d: d.current_url != form_url or d.find_elements(By.CSS_SELECTOR, _SUBMITTED_SELECTOR)
+            )
+            logger.info("Complaint form submitted")
+            return True
+        except TimeoutException:
+            logger.warning(f"Form was not submitted within {timeout}s, closing the browser")
+            return False
+    
+    def _cache_form_fields(self):
+        """Collect every named form field in a single WebDriver round-trip."""
+        self._fields_by_name = self.driver.execute_script(
+            "var fields = {};"
+            "document.querySelectorAll('form input[name], form textarea[name], form select[name]')"
+            ".forEach(function (el) { if (!(el.name in fields)) { fields[el.name] = el; } });"
+            "return fields;"
+        ) or {}
     
     def _fill_field_by_name(self, field_name, value):
         """Fill a form field by name."""
         try:
-            # Try different selectors
-            selectors = [
-                f"input[name='{field_name}']",
-                f"textarea[name='{field_name}']",
-                f"#{field_name}",
-                f".{field_name}"
-            ]
-            
-            for selector in selectors:
-                try:
-                    field = self.driver.find_element(By.CSS_SELECTOR, selector)
-                    field.clear()
-                    field.send_keys(value)
-                    logger.info(f"Filled {field_name} with {value}")
-                    return True
-                except NoSuchElementException:
-                    continue
+            field = self._fields_by_name.get(field_name)
+            if field is None:
+                # Not a named input/textarea - try id and class selectors
+                for selector in (f"#{field_name}", f".{field_name}"):
+                    try:
+                        field = self.driver.find_element(By.CSS_SELECTOR, selector)
+                        break
+                    except NoSuchElementException:
+                        continue
             
-            logger.warning(f"Could not find field: {field_name}")
-            return False
+            if field is None:
+                logger.warning(f"Could not find field: {field_name}")
+                return False
+            
+            try:
+                # One round-trip instead of one simulated keystroke per character
+                self.driver.execute_script(_SET_VALUE_JS, field, value)
+            except WebDriverException:
+                field.clear()
+                field.send_keys(value)
+            logger.info(f"Filled {field_name} with {value}")
+            return True
             
         except Exception as e:
             logger.error(f"Error filling field {field_name}: {e}")
@@ -140,40 +232,31 @@ class ComplaintFormFiller:
     def _select_help_topic(self):
         """Try to select an appropriate help topic."""
         try:
-            # Look for help topic dropdown
-            help_topic_selectors = [
-                "select[name='topicId']",
-                "select[name='topic']",
-                "select[name='help_topic']",
-                "#topicId"
-            ]
-            
-            for selector in help_topic_selectors:
-                try:
-                    select_element = self.driver.find_element(By.CSS_SELECTOR, selector)
-                    select = Select(select_element)
-                    
-                    # Try to select a relevant option
-                    options_text = [option.text.lower() for option in select.options]
-                    
-                    # Look for relevant categories
-                    preferred_options = ['cwn', 'internet', 'wifi', 'infrastructure', 'general']
-                    
-                    for pref in preferred_options:
-                        for i, option_text in enumerate(options_text):
-                            if pref in option_text:
-                                select.select_by_index(i)
-                                logger.info(f"Selected help topic: {select.options[i].text}")
-                                return True
-                    
-                    # If no preferred option found, select the first non-empty option
-                    if len(select.options) > 1:
-                        select.select_by_index(1)
-                        logger.info(f"Selected default help topic: {select.options[1].text}")
-                        return True
-                        
-                except NoSuchElementException:
-                    continue
+            # Look for help topic dropdown; the form has already loaded, so don't wait for it
+            help_topic_selector = "select[name='topicId'], select[name='topic'], select[name='help_topic'], #topicId"
+            select_elements = self.driver.find_elements(By.CSS_SELECTOR, help_topic_selector)
+            
+            if select_elements:
+                select = Select(select_elements[0])
+                
+                # Try to select a relevant option
+                options_text = [option.text.lower() for option in select.options]
+                
+                # Look for relevant categories
+                preferred_options = ['cwn', 'internet', 'wifi', 'infrastructure', 'general']
+                
+                for pref in preferred_options:
+                    for i, option_text in enumerate(options_text):
+                        if pref in option_text:
+                            select.select_by_index(i)
+                            logger.info(f"Selected help topic: {select.options[i].text}")
+                            return True
+                
+                # If no preferred option found, select the first non-empty option
+                if len(select.options) > 1:
+                    select.select_by_index(1)
+                    logger.info(f"Selected default help topic: {select.options[1].text}")
+                    return True
             
             logger.warning("Could not find help topic dropdown")
             return False
@@ -182,6 +265,34 @@ class ComplaintFormFiller:
             logger.error(f"Error selecting help topic: {e}")
             return False
 
+def submit_many(complaint_list, workers=2, headless=False):
+    """
+    Fill several complaint forms in parallel.
+    
+    Each worker thread owns one browser session and reuses it for every form
+    it handles. Returns one success flag per complaint, in input order.
+    The portal's CAPTCHA has to be solved by a person in each window, so only
+    pass headless=True for forms that don't ask for one.
+    """
+    local = threading.local()
+    fillers = []
+    fillers_lock = threading.Lock()
+    
+    def _fill(complaint_data):
+        filler = getattr(local, "filler", None)
+        if filler is None:
+            filler = local.filler = ComplaintFormFiller(headless=headless)
+            with fillers_lock:
+                fillers.append(filler)
+        return filler.fill_complaint_form(complaint_data, close_browser=False)
+    
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(_fill, complaint_list))
+    finally:
+        for filler in fillers:
+            filler.close()
+
 # Example usage
 if __name__ == "__main__":
     # Example complaint data
@@ -1,38 +1,198 @@
 import os
-import json
-from typing import Dict, List, Optional
-from langchain_pinecone import PineconeVectorStore
-from pinecone import Pinecone, PineconeException
-from langchain_community.embeddings import SentenceTransformerEmbeddings
-from langchain_groq import ChatGroq
-
-# Import agent utilities with fallbacks to support multiple LangChain versions.
-try:
-    from langchain.agents import AgentExecutor
-except ImportError:  # pragma: no cover
-    from langchain.agents.agent import AgentExecutor  # type: ignore
-
-try:
-    from langchain.agents import create_react_agent
-except ImportError:  # pragma: no cover
-    from langchain.agents.react.agent import create_react_agent  # type: ignore
-
-try:
-    from langchain.tools import Tool
-except ImportError:  # pragma: no cover
-    from langchain.agents import Tool  # type: ignore
-from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain.tools.retriever import create_retriever_tool
+import functools
+import asyncio
+import contextvars
+import queue
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, AsyncIterator, Callable, Dict, Iterator, List, Mapping, MutableMapping, Optional, Tuple
+from langchain_core.callbacks import BaseCallbackHandler
 import re
 from menu import MessMenu
 from hostel_photos import HostelPhotos
 from complaint_handler import ComplaintHandler
+from embeddings import CachedEmbeddings, MicroBatchEmbeddings
 import logging
 
-# Set up logging
-logging.basicConfig(level=logging.DEBUG)
+# Pinecone, Groq, the agent framework and sentence-transformers (torch) are imported
+# where they are first used, so small talk and complaint commands don't load them
+if TYPE_CHECKING:
+    from langchain.agents import AgentExecutor
+    from langchain_groq import ChatGroq
+    from langchain_pinecone import PineconeVectorStore
+
 logger = logging.getLogger(__name__)
 
+# Upper bound on agent runs in flight for one aget_response_batch call
+_BATCH_MAX_CONCURRENCY = 10
+
+# Unwraps a menu tool argument the LLM wrote as "day='today'", "'today'" or "day=today"
+_MENU_ARG_RE = re.compile(r"""\s*(?:day\s*=\s*)?['"]?\s*(.*?)\s*['"]?\s*\Z""", re.DOTALL)
+
+# Extracts the raw LLM text from a ReAct output parsing error
+_PARSE_ERROR_RE = re.compile(r"Could not parse LLM output: `(.+?)`", re.DOTALL)
+
+# Front-door intent triggers, matched against the question's word set
+_WORD_RE = re.compile(r"[a-z']+")
+_PHOTO_TRIGGERS = frozenset({"photo", "photos", "picture", "pictures", "pic", "pics", "image", "images"})
+_MENU_TRIGGERS = frozenset({"menu", "breakfast", "lunch", "dinner"})
+# Menu-word questions that are plain menu lookups: "today's menu", "what's for lunch", "dinner on sunday"
+_MENU_LOOKUP_RE = re.compile(
+    r"\bmenu\b|\bwhat(?:'s| is)? (?:there )?for (?:breakfast|lunch|dinner)\b"
+    r"|\b(?:breakfast|lunch|dinner) (?:menu|on|today)\b"
+)
+# Menu-word questions the direct route can't answer (left to the agent): relative days, menu
+# changes, and timing/fee/guest/policy questions ("what time is breakfast?", "who decides the menu?")
+_MENU_AGENT_RE = re.compile(
+    r"\b(tomorrow|yesterday|tonight|next|last|chang(e|ed|es|ing)|times?|timings?|hours?|fees?|charges?"
+    r"|cost|price|free|guests?|served|board|when|where|who|why|how)\b"
+)
+_WEEK_RE = re.compile(r"\bweek(ly)?\b")
+# Meal named in a menu question -> MessMenu meal slot
+_MEALS = {"breakfast": "morning", "lunch": "evening", "dinner": "night"}
+# Food/day words the knowledge base can't answer (the menu lives behind get_mess_menu), so
+# questions using them never take the FAQ route
+_MENU_HINTS = frozenset({
+    "food", "foods", "dessert", "desserts", "eat", "eating", "serve", "served", "meal", "meals",
+    "today", "today's", "tonight", "tomorrow", "sunday", "monday", "tuesday", "wednesday",
+    "thursday", "friday", "saturday",
+})
+# Opening words of plain knowledge-base questions, answered by one retrieval and one LLM call
+_FAQ_OPENERS = frozenset({
+    "what", "what's", "where", "where's", "when", "who", "who's", "which", "why", "how",
+    "is", "are", "can", "could", "does", "do", "tell", "explain",
+})
+
+# Session-state key holding a user's in-progress complaint (None when there is none)
+_COMPLAINT_FLOW_KEY = "complaint_flow"
+
+_ERROR_RESPONSE_TEXT = "Sorry, I encountered an error while processing your request. Please try again."
+
+# Collapses punctuation/whitespace so trivially different phrasings share a cache entry
+_NON_WORD_RE = re.compile(r"\W+")
+_ANSWER_CACHE_SIZE = 256
+# Tools whose output doesn't change during the day; answers built only from these are cacheable
+_CACHEABLE_TOOLS = frozenset({"hostel_information_retriever"})
+# "Not in the hostel information" answers (see _FAQ_TEMPLATE) aren't worth repeating to everyone
+_UNANSWERED_RE = re.compile(r"contact(?:ing)? the hostel office", re.IGNORECASE)
+
+# Everything the ReAct LLM writes before this marker is reasoning, not answer text
+_FINAL_ANSWER_MARKER = "Final Answer:"
+_STREAM_DONE = object()
+
+# Photo lists returned by get_hostel_photos during the current agent run. A context
+# variable keeps concurrent sessions sharing one agent from seeing each other's photos.
+_photo_capture: contextvars.ContextVar[Optional[List]] = contextvars.ContextVar("arya_photo_capture", default=None)
+
+# The Pinecone index was built with this model; a different one needs a re-indexed namespace
+_DEFAULT_EMBEDDING_MODEL = "intfloat/multilingual-e5-large"
+
+# Process-wide embedding model; the weights are loaded once, not per chatbot
+_embeddings = None
+_embeddings_lock = threading.Lock()
+
+def _get_embeddings() -> CachedEmbeddings:
+    """Return the shared query embedding model, loading it on first use."""
+    global _embeddings
+    with _embeddings_lock:
+        if _embeddings is None:
+            # Optional alternative inference backend, e.g. ARYA_EMBEDDING_BACKEND=onnx with
+            # ARYA_EMBEDDING_ONNX_FILE=onnx/model_qint8_avx512_vnni.onnx for an int8 model
+            model_kwargs = {}
+            backend = os.getenv("ARYA_EMBEDDING_BACKEND")
+            if backend:
+                model_kwargs["backend"] = backend
+                onnx_file = os.getenv("ARYA_EMBEDDING_ONNX_FILE")
+                if onnx_file:
+                    model_kwargs["model_kwargs"] = {"file_name": onnx_file}
+            else:
+                import torch
+                if torch.cuda.is_available():
+                    # Half-precision weights on GPU; CPU hosts keep the fp32 default
+                    model_kwargs["device"] = "cuda"
+                    model_kwargs["model_kwargs"] = {"torch_dtype": torch.float16}
+
+            from langchain_community.embeddings import SentenceTransformerEmbeddings
+
+            # Repeated queries skip the model entirely; concurrent misses share one batched forward pass
+            _embeddings = CachedEmbeddings(MicroBatchEmbeddings(SentenceTransformerEmbeddings(
+                model_name=os.getenv("ARYA_EMBEDDING_MODEL", _DEFAULT_EMBEDDING_MODEL),
+                model_kwargs=model_kwargs,
+                encode_kwargs={'normalize_embeddings': True}
+            )))
+        return _embeddings
+
+@functools.lru_cache(maxsize=4)
+def _get_pinecone_index(api_key: str, environment: str, index_name: str):
+    """Return a shared Pinecone index handle so chatbot instances reuse one client and its connections."""
+    from pinecone import Pinecone
+    return Pinecone(api_key=api_key, environment=environment).Index(index_name)
+
+# On-disk LLM response cache used when REDIS_URL is not set
+_LLM_CACHE_PATH = ".arya_llm_cache.db"
+
+def _configure_llm_cache() -> None:
+    """Install a process-wide LangChain LLM cache (Redis if REDIS_URL is set, else SQLite)."""
+    from langchain_core.globals import get_llm_cache, set_llm_cache
+    if get_llm_cache() is not None:
+        return
+    redis_url = os.getenv("REDIS_URL")
+    if redis_url:
+        import redis
+        from langchain_community.cache import RedisCache
+        set_llm_cache(RedisCache(redis.Redis.from_url(redis_url)))
+    else:
+        from langchain_community.cache import SQLiteCache
+        set_llm_cache(SQLiteCache(database_path=_LLM_CACHE_PATH))
+
+class _FinalAnswerFilter:
+    """Passes through only the LLM tokens that follow `marker` (the ReAct "Final Answer:" by default)."""
+
+    def __init__(self, marker: str = _FINAL_ANSWER_MARKER):
+        self.marker = marker
+        self.reset()
+
+    def reset(self) -> None:
+        # Each ReAct step is a new LLM call; only the one that writes the answer is forwarded
+        self._buffer = ""
+        self._in_answer = False
+
+    def feed(self, token: str) -> str:
+        if self._in_answer:
+            return token
+        self._buffer += token
+        marker_pos = self._buffer.find(self.marker)
+        if marker_pos == -1:
+            return ""
+        self._in_answer = True
+        return self._buffer[marker_pos + len(self.marker):].lstrip()
+
+class _FinalAnswerStreamHandler(BaseCallbackHandler):
+    """Forwards LLM tokens that follow the ReAct "Final Answer:" marker to a callback."""
+
+    def __init__(self, on_token: Callable[[str], None], marker: str = _FINAL_ANSWER_MARKER):
+        self.on_token = on_token
+        self._filter = _FinalAnswerFilter(marker)
+
+    def on_llm_start(self, *args, **kwargs) -> None:
+        self._filter.reset()
+
+    def on_llm_new_token(self, token: str, **kwargs) -> None:
+        text = self._filter.feed(token)
+        if text:
+            self.on_token(text)
+
+def _join_documents(docs) -> str:
+    """Concatenate retrieved chunks into one context block for the FAQ prompt."""
+    return "\n\n".join(doc.page_content for doc in docs)
+
+def _compile_smalltalk(responses) -> "re.Pattern":
+    """One anchored regex with a capture group per phrase set; m.lastindex - 1 indexes `responses`."""
+    groups = "|".join(
+        "(" + "|".join(re.escape(phrase) for phrase in phrases) + ")" for phrases, _ in responses
+    )
+    return re.compile(rf"(?:{groups})(?: |\Z)")
+
 class AryaChatbot:
     SMALLTALK_RESPONSES = [
         (("hi", "hii", "hello", "hey", "hay", "hola", "namaste"),
@@ -44,6 +204,88 @@ class AryaChatbot:
         (("who are you", "who r u", "what are you"),
          "I'm Arya, the Arya Bhatt Hostel AI assistant. Ask me about rooms, mess menu, complaints, or general info!"),
     ]
+    _SMALLTALK_RE = _compile_smalltalk(SMALLTALK_RESPONSES)
+    _CANCEL_COMMANDS = frozenset({"cancel complaint", "stop complaint", "cancel"})
+
+    _RETRIEVER_TOOL_DESCRIPTION = (
+        "Searches and returns information about Arya Bhatt Hostel. "
+        "Use it for questions about hostel rules, facilities, contact information, etc."
+    )
+    _MENU_TOOL_DESCRIPTION = (
+        "Get the mess menu. Input should be just the day name: 'today' for current menu, "
+        "'Monday'/'Tuesday'/etc for specific day, or 'week' for full week. "
+        "Examples: today, Monday, week"
+    )
+    _PHOTOS_TOOL_DESCRIPTION = (
+        "Use this to fetch hostel photo paths. Provide the user's request (e.g., 'show rooms photos'). "
+        "The tool says how many photos were found; they are displayed to the user automatically."
+    )
+
+    # Everything before "Question: {input}" renders identically on every call ({tools} and
+    # {tool_names} are fixed per agent), so keep per-request fields at the end: providers
+    # that cache prompt prefixes can then reuse it. create_react_agent requires both
+    # variables to stay in the template rather than being pre-rendered.
+    _AGENT_TEMPLATE = """You are Arya, a helpful AI assistant for the Arya Bhatt Hostel.
+
+You have access to the following tools:
+
+{tools}
+
+Use this EXACT format:
+
+Question: the input question you must answer
+Thought: you should always think about what to do
+Action: the action to take, should be one of [{tool_names}]
+Action Input: the input value (just simple text, no parameter names)
+Observation: the result of the action
+... (repeat Thought/Action/Input/Observation ONLY if needed)
+Thought: I now know the final answer
+Final Answer: the final answer to the original input question
+
+CRITICAL RULES:
+1. Action Input must be simple: "today" NOT "day='today'".
+2. Use at most 2 tool calls per user question. If you are still unsure, answer politely and ask the user to clarify.
+3. Once you get a successful Observation, immediately provide Final Answer.
+4. ALWAYS end with "Final Answer: <answer>".
+5. Don't repeat the same action with the same input.
+
+Examples:
+- For "current menu": Action Input is "today"
+- For "Monday menu": Action Input is "Monday"
+- For "show rooms": Action Input is "rooms"
+
+Begin!
+
+Question: {input}
+Thought:{agent_scratchpad}"""
+    _FAQ_TEMPLATE = """You are Arya, a helpful AI assistant for the Arya Bhatt Hostel.
+Answer the question using only the hostel information below. If it doesn't contain the answer,
+say so politely and suggest contacting the hostel office.
+
+Hostel information:
+{context}
+
+Question: {input}
+Answer:"""
+
+    _MULTI_INTENT_TEMPLATE = """You are Arya, a helpful AI assistant for the Arya Bhatt Hostel.
+Answer the question using the lookups below. Include the relevant menu items, and if photos
+were found, mention that they are shown with your answer.
+
+Mess menu:
+{menu}
+
+Photos:
+{photos}
+
+Hostel information:
+{context}
+
+Question: {input}
+Answer:"""
+
+    # Parsed from _AGENT_TEMPLATE on first use and shared by every instance
+    _agent_prompt = None
 
     def __init__(self, pinecone_api_key: str, pinecone_env: str, groq_api_key: str):
         """Initialize the chatbot with necessary credentials."""
@@ -53,44 +295,132 @@ class AryaChatbot:
         self.vector_store = None
         self.llm = None
         self.agent_executor = None  # Changed from qa_chain
+        self.faq_chain = None
+        self.multi_intent_chain = None
         self.menu_system = MessMenu()
         self.photo_system = HostelPhotos()
         self.complaint_handler = ComplaintHandler()
+        # In-progress complaint flows for callers that don't pass their own session_state,
+        # keyed by user_session; entries are dropped as soon as the flow ends
+        self._complaint_flows = {}
+        # classify_complaint is a pure keyword check, so repeat questions reuse its verdict
+        self._classify_complaint = functools.lru_cache(maxsize=512)(self.complaint_handler.classify_complaint)
+        # LRU of agent answers keyed by normalized question
+        self._answer_cache = OrderedDict()
+        self._answer_cache_lock = threading.Lock()
         
-    def _handle_smalltalk(self, text: str) -> Optional[Dict[str, str]]:
-        """Return canned responses for greetings or small talk to avoid unnecessary tool calls."""
-        if not text:
+    def _handle_smalltalk(self, normalized: str) -> Optional[Dict[str, str]]:
+        """
+        Return canned responses for greetings or small talk to avoid unnecessary tool calls.
+        Expects the question already lowercased and stripped.
+        """
+        match = self._SMALLTALK_RE.match(normalized)
+        if match is None:
             return None
+        return {"text": self.SMALLTALK_RESPONSES[match.lastindex - 1][1]}
+
+    def _route_intent(self, question_lower: str, words: frozenset) -> Optional[str]:
+        """
+        Return 'menu', 'photos' or 'faq' for clear single-intent questions, 'multi' for
+        menu-plus-photos questions, None otherwise.
+        """
+        routes = set()
+        if words & _PHOTO_TRIGGERS:
+            routes.add("photos")
+        if words & _MENU_TRIGGERS:
+            routes.add("menu")
+        # "show me the rooms" is a photo request only when it names something photographed;
+        # "show me the complaint process" is not
+        if not routes and "show me" in question_lower and self.photo_system.mentions_photo_subject(question_lower):
+            routes.add("photos")
+        # The FAQ chain has no photo or menu tool, so anything that might want photos ("can I
+        # view the mess?") or the menu ("is there dessert on friday?") stays with the agent
+        if not routes and not words & _MENU_HINTS and not self.photo_system.may_want_photos(question_lower):
+            first_word = question_lower.split(maxsplit=1)[0] if question_lower else ""
+            if first_word in _FAQ_OPENERS or question_lower.endswith("?"):
+                routes.add("faq")
+        if routes == {"menu", "photos"}:
+            return "multi"
+        return routes.pop() if len(routes) == 1 else None
+
+    def _handle_routed_intent(self, route: str, question: str, question_lower: str) -> Optional[Dict]:
+        """Answer a routed question directly from its tool, or None to fall back to the agent."""
+        if route == "photos":
+            photos = self.photo_system.handle_photo_query(question)
+            if photos:
+                return {"kind": "photos", "photos": photos, "text": "Here are the photos you requested."}
+        elif route == "menu":
+            menu_text = self._menu_text(question_lower)
+            if menu_text is not None:
+                return {"text": menu_text}
+        return None
 
-        normalized = text.lower().strip()
-        if not normalized:
+    def _menu_day(self, question_lower: str) -> Optional[str]:
+        """Return the menu day asked about ('week', a weekday or 'today'), or None for agent-only questions."""
+        if not _MENU_LOOKUP_RE.search(question_lower) or _MENU_AGENT_RE.search(question_lower):
             return None
-
-        for phrases, response in self.SMALLTALK_RESPONSES:
-            for phrase in phrases:
-                if normalized == phrase or normalized.startswith(f"{phrase} "):
-                    return {"text": response}
-        return None
+        if _WEEK_RE.search(question_lower):
+            return "week"
+        return self.menu_system.find_day(question_lower) or "today"
+
+    def _menu_text(self, question_lower: str) -> Optional[str]:
+        """Return the menu for the day and meal asked about (the full day if no meal is named), or None."""
+        day = self._menu_day(question_lower)
+        if day is None:
+            return None
+        if day == "week":
+            return self.menu_system.get_menu(day)
+        meal = next((_MEALS[word] for word in _WORD_RE.findall(question_lower) if word in _MEALS), None)
+        return self.menu_system.get_meal_menu(day, meal)
+
+    def _capture_photos(self, request: str) -> str:
+        """Report how many photos match `request`; the paths reach the user through _photo_capture."""
+        photos = self.photo_system.handle_photo_query(request or "")
+        if not photos:
+            return "No hostel photos matched that request."
+        captured = _photo_capture.get()
+        if captured is not None:
+            captured.append(photos)
+        return f"Found {len(photos)} hostel photos; they will be shown to the user with your answer."
+
+    def _get_cached_answer(self, cache_key: str) -> Optional[Dict]:
+        """Return a previously cached agent answer for the normalized question."""
+        with self._answer_cache_lock:
+            answer = self._answer_cache.get(cache_key)
+            if answer is not None:
+                self._answer_cache.move_to_end(cache_key)
+            return answer
+
+    def _cache_answer(self, cache_key: str, answer: Dict) -> None:
+        """Store an agent answer, evicting the least recently used one when full."""
+        with self._answer_cache_lock:
+            self._answer_cache[cache_key] = answer
+            self._answer_cache.move_to_end(cache_key)
+            if len(self._answer_cache) > _ANSWER_CACHE_SIZE:
+                self._answer_cache.popitem(last=False)
 
     def setup(self):
         """Set up all components of the chatbot."""
         try:
             self.vector_store = self.setup_pinecone()
+            # Run one forward pass now so the first user query doesn't pay model load/init
+            self.vector_store.embeddings.embed_query("warmup")
             self.llm = self.setup_llm()
             self.agent_executor = self.create_agent()  # Changed from create_qa_chain
+            self.faq_chain = self.create_faq_chain()
+            self.multi_intent_chain = self.create_multi_intent_chain()
         except Exception as e:
             raise Exception(f"Failed to initialize chatbot: {str(e)}")
         
-    def setup_pinecone(self, index_name: str = "arya-index-o") -> PineconeVectorStore:
+    def setup_pinecone(self, index_name: str = "arya-index-o") -> "PineconeVectorStore":
         """Initialize Pinecone and return vector store."""
+        from langchain_pinecone import PineconeVectorStore
+        from pinecone import PineconeException
+
         try:
-            pc = Pinecone(api_key=self.pinecone_api_key, environment=self.pinecone_env)
-            index = pc.Index(index_name)
+            index = _get_pinecone_index(self.pinecone_api_key, self.pinecone_env, index_name)
             
-            embeddings = SentenceTransformerEmbeddings(
-                model_name="intfloat/multilingual-e5-large",
-                encode_kwargs={'normalize_embeddings': True}
-            )
+            embeddings = _get_embeddings()
             
             return PineconeVectorStore(
                 index=index,
@@ -100,108 +430,130 @@ class AryaChatbot:
         except PineconeException as e:
             raise Exception(f"Failed to initialize Pinecone: {str(e)}")
 
-    def setup_llm(self) -> ChatGroq:
+    def setup_llm(self) -> "ChatGroq":
         """Initialize the language model."""
         try:
+            from langchain_groq import ChatGroq
+
+            # Identical prompts (same question and tool observations) are answered from cache
+            _configure_llm_cache()
             return ChatGroq(
                 groq_api_key=self.groq_api_key,
                 model_name="llama-3.1-8b-instant",
                 temperature=0.3,
-                max_tokens=2048
+                max_tokens=2048,
+                streaming=True
             )
                 
         except Exception as e:
             raise Exception(f"Failed to initialize language model: {str(e)}")
 
-    def create_agent(self) -> AgentExecutor:
+    def _create_retriever(self):
+        """Return the knowledge-base retriever shared by the agent tool and the FAQ chain."""
+        # MMR drops near-duplicate chunks so fewer redundant tokens reach the prompt
+        return self.vector_store.as_retriever(
+            search_type="mmr",
+            search_kwargs={'k': 2, 'fetch_k': 8, 'lambda_mult': 0.5}
+        )
+
+    def create_faq_chain(self):
+        """Create a retrieve-then-answer chain for questions that need no other tool."""
+        from operator import itemgetter
+        from langchain_core.output_parsers import StrOutputParser
+        from langchain_core.prompts import PromptTemplate
+        from langchain_core.runnables import RunnableParallel
+
+        answer = (
+            {"context": itemgetter("input") | self._create_retriever() | _join_documents,
+             "input": itemgetter("input")}
+            | PromptTemplate.from_template(self._FAQ_TEMPLATE)
+            | self.llm
+            | StrOutputParser()
+        )
+        # Same {"output": ...} shape as the agent so both share _finish_agent_answer
+        return RunnableParallel(output=answer)
+
+    def create_multi_intent_chain(self):
+        """Create a chain that runs the menu, photo and knowledge-base lookups concurrently, then answers once."""
+        from operator import itemgetter
+        from langchain_core.output_parsers import StrOutputParser
+        from langchain_core.prompts import PromptTemplate
+        from langchain_core.runnables import RunnableLambda, RunnableParallel
+
+        def _lookup_menu(inputs: Dict) -> str:
+            return self._menu_text(inputs["input"].lower()) or self.menu_system.get_meal_menu("today")
+
+        # RunnableParallel fans the branches out (thread pool for invoke, asyncio.gather for ainvoke)
+        lookups = RunnableParallel(
+            menu=RunnableLambda(_lookup_menu),
+            photos=itemgetter("input") | RunnableLambda(self._capture_photos),
+            context=itemgetter("input") | self._create_retriever() | _join_documents,
+            input=itemgetter("input"),
+        )
+        answer = (
+            lookups
+            | PromptTemplate.from_template(self._MULTI_INTENT_TEMPLATE)
+            | self.llm
+            | StrOutputParser()
+        )
+        return RunnableParallel(output=answer)
+
+    @classmethod
+    def _get_agent_prompt(cls):
+        """Return the ReAct PromptTemplate (required by create_react_agent), parsing it once."""
+        if cls._agent_prompt is None:
+            from langchain_core.prompts import PromptTemplate
+            cls._agent_prompt = PromptTemplate.from_template(cls._AGENT_TEMPLATE)
+        return cls._agent_prompt
+
+    def create_agent(self) -> "AgentExecutor":
         """Create an agent that can use tools to answer questions."""
-        
-        retriever = self.vector_store.as_retriever(search_kwargs={'k': 3})
+        # Import agent utilities with fallbacks to support multiple LangChain versions.
+        try:
+            from langchain.agents import AgentExecutor
+        except ImportError:  # pragma: no cover
+            from langchain.agents.agent import AgentExecutor  # type: ignore
+
+        try:
+            from langchain.agents import create_react_agent
+        except ImportError:  # pragma: no cover
+            from langchain.agents.react.agent import create_react_agent  # type: ignore
+
+        try:
+            from langchain.tools import Tool
+        except ImportError:  # pragma: no cover
+            from langchain.agents import Tool  # type: ignore
+        from langchain.tools.retriever import create_retriever_tool
+
+        retriever = self._create_retriever()
 
         # Create a tool for general knowledge retrieval
         retriever_tool = create_retriever_tool(
             retriever,
             "hostel_information_retriever",
-            "Searches and returns information about Arya Bhatt Hostel. Use it for questions about hostel rules, facilities, contact information, etc."
+            self._RETRIEVER_TOOL_DESCRIPTION
         )
 
         def _get_mess_menu(day: str = "today") -> str:
             """Return formatted mess menu details for the requested day."""
-            # Clean input - remove parameter names if LLM includes them
-            cleaned_day = day.strip() if day else "today"
-            # Handle cases like "day='today'", "'today'", or "day=today"
-            cleaned_day = cleaned_day.replace("day=", "").strip("'\"").strip()
-            if not cleaned_day:
-                cleaned_day = "today"
-            return self.menu_system.get_menu(cleaned_day)
+            match = _MENU_ARG_RE.match(day or "")
+            return self.menu_system.get_menu(match.group(1) or "today")
 
         menu_tool = Tool(
             name="get_mess_menu",
             func=_get_mess_menu,
-            description=(
-                "Get the mess menu. Input should be just the day name: 'today' for current menu, "
-                "'Monday'/'Tuesday'/etc for specific day, or 'week' for full week. "
-                "Examples: today, Monday, week"
-            )
+            description=self._MENU_TOOL_DESCRIPTION
         )
 
-        def _get_hostel_photos(request: str) -> str:
-            """Return JSON with photo paths related to the user's request."""
-            query = request or ""
-            photos = self.photo_system.handle_photo_query(query)
-            if not photos:
-                photos = []
-            return json.dumps({"photos": photos})
-
         photos_tool = Tool(
             name="get_hostel_photos",
-            func=_get_hostel_photos,
-            description=(
-                "Use this to fetch hostel photo paths. Provide the user's request (e.g., 'show rooms photos'). "
-                "The tool returns JSON containing the photo paths."
-            )
+            func=self._capture_photos,
+            description=self._PHOTOS_TOOL_DESCRIPTION
         )
 
         tools = [retriever_tool, menu_tool, photos_tool]
 
-        # Use PromptTemplate for ReAct agent (required by create_react_agent)
-        from langchain_core.prompts import PromptTemplate
-        
-        template = """You are Arya, a helpful AI assistant for the Arya Bhatt Hostel.
-
-You have access to the following tools:
-
-{tools}
-
-Use this EXACT format:
-
-Question: the input question you must answer
-Thought: you should always think about what to do
-Action: the action to take, should be one of [{tool_names}]
-Action Input: the input value (just simple text, no parameter names)
-Observation: the result of the action
-... (repeat Thought/Action/Input/Observation ONLY if needed)
-Thought: I now know the final answer
-Final Answer: the final answer to the original input question
-
-CRITICAL RULES:
-1. Action Input must be simple: "today" NOT "day='today'".
-2. Use at most 2 tool calls per user question. If you are still unsure, answer politely and ask the user to clarify.
-3. Once you get a successful Observation, immediately provide Final Answer.
-4. ALWAYS end with "Final Answer: <answer>".
-5. Don't repeat the same action with the same input.
-
-Examples:
-- For "current menu": Action Input is "today"
-- For "Monday menu": Action Input is "Monday"
-- For "show rooms": Action Input is "rooms"
-
-Begin!
-
-Question: {input}
-Thought:{agent_scratchpad}"""
-
-        prompt = PromptTemplate.from_template(template)
+        prompt = self._get_agent_prompt()
 
         # Custom error handler for parsing errors
         def handle_parse_error(error) -> str:
@@ -210,8 +562,7 @@ Thought:{agent_scratchpad}"""
             # Extract the actual LLM output if available
             if "Could not parse LLM output:" in error_msg:
                 # The output is usually after this phrase
-                import re
-                match = re.search(r"Could not parse LLM output: `(.+?)`", error_msg, re.DOTALL)
+                match = _PARSE_ERROR_RE.search(error_msg)
                 if match:
                     llm_output = match.group(1).strip()
                     # Return the output as Final Answer since LLM didn't format correctly
@@ -223,76 +574,278 @@ Thought:{agent_scratchpad}"""
         return AgentExecutor(
             agent=agent,
             tools=tools,
-            verbose=True,
+            # Print each Thought/Action step only when debugging
+            verbose=os.getenv("ARYA_DEBUG") == "1",
             return_intermediate_steps=True,
-            max_iterations=10,
+            # The prompt allows at most 2 tool calls; bound runaway loops in steps and seconds
+            max_iterations=3,
+            max_execution_time=8.0,
             handle_parsing_errors=handle_parse_error,
         )
 
-    def get_response(self, question: str, user_session: str = "default") -> str:
-        try:
-            # Handle greetings and small talk without invoking the agent
-            smalltalk_response = self._handle_smalltalk(question)
-            if smalltalk_response:
-                return smalltalk_response
-
-            # Very short/unclear inputs are handled directly to avoid wasting tool calls
-            if not question or len(question.strip()) < 3:
-                return {"text": "Could you please clarify your question a bit more?"}
-
-            # Complaint handling remains a priority
-            if self.complaint_handler.is_in_complaint_flow(user_session):
-                return self.complaint_handler.process_complaint_step(user_session, question)
-            
-            if self.complaint_handler.detect_complaint(question):
-                return self.complaint_handler.start_complaint_collection(user_session, question)
-            
-            if not self.agent_executor:
-                raise Exception("Chatbot agent not properly initialized. Call setup() first.")
-
-            # Invoke the agent to get a response
-            response = self.agent_executor.invoke({"input": question})
-            output = response.get('output', '')
-            
-            # Handle case where agent hit iteration limit
-            if not output or "Agent stopped" in str(output):
-                # Try to extract useful info from intermediate steps
-                intermediate_steps = response.get("intermediate_steps", [])
-                if intermediate_steps:
-                    last_action, last_observation = intermediate_steps[-1]
-                    # If the last observation looks like a valid response, use it
-                    if last_observation and len(str(last_observation)) > 20:
-                        output = str(last_observation)
-                    else:
-                        output = "I apologize, but I couldn't complete that request. Please try rephrasing."
+    def get_response_stream(self, question: str, user_session: str = "default",
+                            session_state: Optional[MutableMapping] = None) -> Iterator[str]:
+        """
+        Yield the answer text as it is generated.
+        Answers that don't come from the LLM (small talk, menu, complaints, cache hits)
+        are yielded in one piece. Photo paths are only available from get_response.
+        """
+        chunks = queue.Queue()
+        result = {}
+
+        def _run():
+            try:
+                result["response"] = self.get_response(question, user_session, on_token=chunks.put,
+                                                      session_state=session_state)
+            finally:
+                chunks.put(_STREAM_DONE)
+
+        threading.Thread(target=_run, daemon=True).start()
+        streamed = False
+        while True:
+            chunk = chunks.get()
+            if chunk is _STREAM_DONE:
+                break
+            streamed = True
+            yield chunk
+
+        if not streamed:
+            response = result.get("response") or {}
+            yield response.get("text") or response.get("message", "")
+
+    def _answer_without_agent(self, question: str, user_session: str,
+                              session_state: Optional[MutableMapping]) -> Tuple[Optional[Dict], str, Optional[object]]:
+        """
+        Run every check that can answer without the agent (small talk, complaints,
+        direct routes, answer cache). Returns (response, cache_key, runner); response is
+        None when the question has to go to `runner` (a lookup chain or the agent).
+        """
+        # Normalize once; every check below works off these
+        question_lower = (question or "").lower().strip()
+        words = frozenset(_WORD_RE.findall(question_lower))
+
+        # Handle greetings and small talk without invoking the agent
+        smalltalk_response = self._handle_smalltalk(question_lower)
+        if smalltalk_response:
+            return smalltalk_response, "", None
+
+        # Very short/unclear inputs are handled directly to avoid wasting tool calls
+        if not question or len(question.strip()) < 3:
+            return {"text": "Could you please clarify your question a bit more?"}, "", None
+
+        # Complaint handling remains a priority
+        complaint_flow = self._load_complaint_flow(user_session, session_state)
+        if self.complaint_handler.is_in_complaint_flow(complaint_flow):
+            complaint_flow, response = self.complaint_handler.process_complaint_step(complaint_flow, question)
+            self._store_complaint_flow(user_session, session_state, complaint_flow)
+            return response, "", None
+        
+        is_complaint, complaint_category = self._classify_complaint(question_lower)
+        if is_complaint:
+            complaint_flow, response = self.complaint_handler.start_complaint_collection(question, complaint_category)
+            self._store_complaint_flow(user_session, session_state, complaint_flow)
+            return response, "", None
+
+        # Clear menu/photo requests are answered straight from their tool
+        route = self._route_intent(question_lower, words)
+        if route:
+            routed_response = self._handle_routed_intent(route, question, question_lower)
+            if routed_response:
+                return routed_response, "", None
+        
+        if not self.agent_executor:
+            raise Exception("Chatbot agent not properly initialized. Call setup() first.")
+
+        # Menu-plus-photos questions: one concurrent lookup and one LLM call. The menu part
+        # is time-dependent, so these skip the answer cache (empty cache key)
+        if route == "multi" and self.multi_intent_chain and self._menu_day(question_lower):
+            return None, "", self.multi_intent_chain
+
+        # Repeated FAQ-style questions skip the embedding, Pinecone and Groq round-trips
+        cache_key = _NON_WORD_RE.sub(" ", question_lower).strip()
+        cached_answer = self._get_cached_answer(cache_key)
+        if cached_answer is not None:
+            return dict(cached_answer), cache_key, None
+
+        # Plain knowledge-base questions skip the ReAct loop's extra planning call
+        runner = self.faq_chain if route == "faq" and self.faq_chain else self.agent_executor
+        return None, cache_key, runner
+
+    def _load_complaint_flow(self, user_session: str, session_state: Optional[MutableMapping]) -> Optional[Dict]:
+        """Return this user's complaint flow from the caller's session_state, or the per-user fallback."""
+        if session_state is not None:
+            return session_state.get(_COMPLAINT_FLOW_KEY)
+        return self._complaint_flows.get(user_session)
+
+    def _store_complaint_flow(self, user_session: str, session_state: Optional[MutableMapping],
+                              complaint_flow: Optional[Dict]) -> None:
+        """Save this user's complaint flow; a finished flow (None) is evicted from the fallback store."""
+        if session_state is not None:
+            session_state[_COMPLAINT_FLOW_KEY] = complaint_flow
+        elif complaint_flow is not None:
+            self._complaint_flows[user_session] = complaint_flow
+        else:
+            self._complaint_flows.pop(user_session, None)
+
+    def _answer_marker(self, runner) -> str:
+        """Text preceding the user-facing answer in `runner`'s LLM output."""
+        return _FINAL_ANSWER_MARKER if runner is self.agent_executor else ""
+
+    def _finish_agent_answer(self, response: Dict, cache_key: str, photos_found: List) -> Dict:
+        """Turn the agent's raw result into a chat response, caching knowledge-base answers."""
+        output = response.get('output', '')
+        intermediate_steps = response.get("intermediate_steps", [])
+        agent_completed = bool(output) and "Agent stopped" not in str(output)
+        
+        # Handle case where agent hit iteration limit
+        if not agent_completed:
+            # Try to extract useful info from intermediate steps
+            if intermediate_steps:
+                last_action, last_observation = intermediate_steps[-1]
+                # If the last observation looks like a valid response, use it
+                if last_observation and len(str(last_observation)) > 20:
+                    output = str(last_observation)
                 else:
-                    output = "I'm sorry, I couldn't process that request."
-
-            # Look for any photo tool usage to surface actual image paths
-            intermediate_steps = response.get("intermediate_steps", [])
-            for action, observation in reversed(intermediate_steps):
-                try:
-                    if getattr(action, "tool", "") == "get_hostel_photos":
-                        payload = json.loads(observation)
-                        photos = payload.get("photos") if isinstance(payload, dict) else None
-                        if photos:
-                            return {"photos": photos, "text": str(output)}
-                except json.JSONDecodeError:
-                    continue
-            
-            return {"text": str(output)}
+                    output = "I apologize, but I couldn't complete that request. Please try rephrasing."
+            else:
+                output = "I'm sorry, I couldn't process that request."
+
+        # Surface the image paths from the last photo tool call, if any
+        if photos_found:
+            return {"kind": "photos", "photos": photos_found[-1], "text": str(output)}
+
+        answer = {"text": str(output)}
+        # Menu answers depend on the time of day, so only cache knowledge-base answers
+        if cache_key and agent_completed and not _UNANSWERED_RE.search(answer["text"]) and all(
+            getattr(action, "tool", "") in _CACHEABLE_TOOLS for action, _ in intermediate_steps
+        ):
+            self._cache_answer(cache_key, answer)
+        return answer
+
+    def get_response(self, question: str, user_session: str = "default",
+                     on_token: Optional[Callable[[str], None]] = None,
+                     session_state: Optional[MutableMapping] = None) -> Dict:
+        """
+        Answer a question; on_token, if given, receives the final answer as it streams from the LLM.
+        session_state (e.g. st.session_state) holds the user's complaint flow between turns.
+        """
+        try:
+            answer, cache_key, runner = self._answer_without_agent(question, user_session, session_state)
+            if answer is not None:
+                return answer
+
+            # Invoke the FAQ chain or the agent to get a response
+            config = ({"callbacks": [_FinalAnswerStreamHandler(on_token, self._answer_marker(runner))]}
+                      if on_token else None)
+            photos_found = []
+            _photo_capture.set(photos_found)
+            response = runner.invoke({"input": question}, config=config)
+            return self._finish_agent_answer(response, cache_key, photos_found)
 
         except Exception as e:
-            logger.error(f"Error in get_response: {e}")
+            logger.error("Error in get_response: %s", e)
             # Providing a more user-friendly error message
-            return {"text": "Sorry, I encountered an error while processing your request. Please try again."}
+            return {"text": _ERROR_RESPONSE_TEXT}
+
+    async def aget_response(self, question: str, user_session: str = "default",
+                            on_token: Optional[Callable[[str], None]] = None,
+                            session_state: Optional[MutableMapping] = None) -> Dict:
+        """Async get_response: awaits the agent's Groq/Pinecone I/O so concurrent users can share one event loop."""
+        try:
+            answer, cache_key, runner = self._answer_without_agent(question, user_session, session_state)
+            if answer is not None:
+                return answer
 
-    def handle_complaint_command(self, command: str, user_session: str = "default") -> Dict:
+            config = ({"callbacks": [_FinalAnswerStreamHandler(on_token, self._answer_marker(runner))]}
+                      if on_token else None)
+            photos_found = []
+            _photo_capture.set(photos_found)
+            response = await runner.ainvoke({"input": question}, config=config)
+            return self._finish_agent_answer(response, cache_key, photos_found)
+
+        except Exception as e:
+            logger.error("Error in aget_response: %s", e)
+            return {"text": _ERROR_RESPONSE_TEXT}
+
+    async def aget_response_batch(self, requests: List[Tuple[str, str]],
+                                  session_states: Optional[Mapping[str, MutableMapping]] = None) -> List[Dict]:
+        """
+        Answer (user_session, question) pairs concurrently; results come back in request order.
+        Each user's questions run in order against that user's own session state (taken from
+        `session_states` when given), so one user's complaint flow never sees another's messages.
+        """
+        semaphore = asyncio.Semaphore(_BATCH_MAX_CONCURRENCY)
+        results: List[Optional[Dict]] = [None] * len(requests)
+        by_session: Dict[str, List[int]] = {}
+        for index, (user_session, _) in enumerate(requests):
+            by_session.setdefault(user_session, []).append(index)
+
+        async def _answer_session(user_session: str, indices: List[int]) -> None:
+            session_state = session_states.get(user_session) if session_states is not None else None
+            for index in indices:
+                async with semaphore:
+                    results[index] = await self.aget_response(
+                        requests[index][1], user_session, session_state=session_state
+                    )
+
+        await asyncio.gather(*(_answer_session(s, i) for s, i in by_session.items()))
+        return results
+
+    async def aget_response_stream(self, question: str, user_session: str = "default",
+                                   session_state: Optional[MutableMapping] = None) -> AsyncIterator[str]:
+        """Async get_response_stream: yields final-answer tokens from the agent's astream_events."""
+        streamed = False
+        try:
+            answer, cache_key, runner = self._answer_without_agent(question, user_session, session_state)
+            if answer is not None:
+                yield answer.get("text") or answer.get("message", "")
+                return
+
+            answer_filter = _FinalAnswerFilter(self._answer_marker(runner))
+            photos_found = []
+            _photo_capture.set(photos_found)
+            response = None
+            async for event in runner.astream_events({"input": question}, version="v2"):
+                kind = event["event"]
+                if kind == "on_chat_model_start":
+                    answer_filter.reset()
+                elif kind == "on_chat_model_stream":
+                    text = answer_filter.feed(event["data"]["chunk"].content)
+                    if text:
+                        streamed = True
+                        yield text
+                elif kind == "on_chain_end" and not event.get("parent_ids"):
+                    response = event["data"].get("output")
+
+            if response is not None:
+                answer = self._finish_agent_answer(response, cache_key, photos_found)
+                if not streamed:
+                    yield answer["text"]
+
+        except Exception as e:
+            logger.error("Error in aget_response_stream: %s", e)
+            if not streamed:
+                yield _ERROR_RESPONSE_TEXT
+
+    def submit_complaint_form(self, details: Dict[str, str], user_session: str = "default",
+                              session_state: Optional[MutableMapping] = None) -> Dict:
+        """Complete the user's in-progress complaint from a form with all contact details."""
+        complaint_flow, response = self.complaint_handler.submit_complaint_form(
+            self._load_complaint_flow(user_session, session_state), details
+        )
+        self._store_complaint_flow(user_session, session_state, complaint_flow)
+        return response
+
+    def handle_complaint_command(self, command: str, user_session: str = "default",
+                                 session_state: Optional[MutableMapping] = None) -> Dict:
         """Handle specific complaint-related commands."""
         command_lower = command.lower().strip()
         
-        if command_lower in ['cancel complaint', 'stop complaint', 'cancel']:
-            response = self.complaint_handler.cancel_complaint(user_session)
+        if command_lower in self._CANCEL_COMMANDS:
+            complaint_flow, response = self.complaint_handler.cancel_complaint(
+                self._load_complaint_flow(user_session, session_state)
+            )
+            self._store_complaint_flow(user_session, session_state, complaint_flow)
             return {"text": response}
         
         return {"text": "I didn't understand that command. You can say 'cancel complaint' to stop the current complaint registration."}
@@ -1,93 +1,124 @@
 import re
-import requests
-from typing import Dict, Optional, Any
+from typing import Dict, Optional, Any, Tuple
 import logging
-from urllib.parse import urlencode
-import webbrowser
+from urllib.parse import quote_plus
 
 logger = logging.getLogger(__name__)
 
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}\Z')
+_NON_DIGIT_RE = re.compile(r'\D')
+
+_COMPLAINT_KEYWORDS = (
+    # Infrastructure issues
+    'fan not working', 'fan broken', 'fan issue', 'ceiling fan',
+    'light not working', 'light broken', 'bulb not working', 'electricity',
+    'water problem', 'no water', 'tap not working', 'plumbing',
+    'wifi', 'wi-fi', 'internet', 'network', 'connection',
+    'ac not working', 'air conditioner', 'cooling problem',
+    'door broken', 'lock issue', 'window broken',
+
+    # Cleanliness and maintenance
+    'room dirty', 'bathroom dirty', 'cleaning issue', 'garbage',
+    'pest problem', 'insects', 'cockroach', 'rats',
+    'paint peeling', 'wall damage', 'ceiling leak',
+
+    # Mess and food issues
+    'food quality', 'mess problem', 'bad food', 'food complaint',
+    'hygiene issue', 'kitchen problem',
+
+    # Hostel services
+    'laundry problem', 'security issue', 'noise complaint',
+    'common room', 'study room issue',
+
+    # General complaint phrases
+    'complain', 'complaint', 'problem', 'issue', 'broken',
+    'not working', 'malfunctioning', 'damaged', 'faulty'
+)
+# One alternation scans a message once instead of one substring search per keyword.
+# Keywords must start a word ("rats" not in "congrats") but may be inflected ("problems")
+_COMPLAINT_RE = re.compile(r"\b(?:" + "|".join(map(re.escape, _COMPLAINT_KEYWORDS)) + ")")
+
+_TOKEN_RE = re.compile(r'[a-z]+')
+# (category, whole-word keywords, multi-word phrases), checked in order; the first hit wins
+_CATEGORY_KEYWORDS = (
+    ("Electrical", frozenset({'fan', 'fans', 'light', 'lights', 'bulb', 'bulbs', 'electricity', 'ac'}),
+     ('air conditioner',)),
+    ("Plumbing", frozenset({'water', 'tap', 'taps', 'plumbing', 'bathroom', 'bathrooms', 'toilet', 'toilets'}), ()),
+    ("Internet/WiFi", frozenset({'wifi', 'internet', 'network'}), ('wi-fi',)),
+    ("Mess/Food", frozenset({'food', 'mess', 'kitchen', 'hygiene'}), ()),
+    ("Cleanliness", frozenset({'cleaning', 'dirty', 'garbage', 'pest', 'pests'}), ()),
+    ("Infrastructure", frozenset({'door', 'doors', 'window', 'windows', 'lock', 'locks', 'paint',
+                                  'wall', 'walls', 'ceiling'}), ()),
+    ("Hostel Services", frozenset({'noise', 'security'}), ('common room',)),
+)
+
 class ComplaintHandler:
     def __init__(self):
         self.complaint_base_url = "https://grs.ietlucknow.ac.in/open.php"
-        self.complaint_states = {}  # Store complaint collection states for different users
+        # Per-user flow state is owned by the caller (e.g. the user's Streamlit session) and passed in
         
     def detect_complaint(self, message: str) -> bool:
         """Detect if the message contains a complaint."""
-        complaint_keywords = [
-            # Infrastructure issues
-            'fan not working', 'fan broken', 'fan issue', 'ceiling fan',
-            'light not working', 'light broken', 'bulb not working', 'electricity',
-            'water problem', 'no water', 'tap not working', 'plumbing',
-            'wifi', 'wi-fi', 'internet', 'network', 'connection',
-            'ac not working', 'air conditioner', 'cooling problem',
-            'door broken', 'lock issue', 'window broken',
-            
-            # Cleanliness and maintenance
-            'room dirty', 'bathroom dirty', 'cleaning issue', 'garbage',
-            'pest problem', 'insects', 'cockroach', 'rats',
-            'paint peeling', 'wall damage', 'ceiling leak',
-            
-            # Mess and food issues
-            'food quality', 'mess problem', 'bad food', 'food complaint',
-            'hygiene issue', 'kitchen problem',
-            
-            # Hostel services
-            'laundry problem', 'security issue', 'noise complaint',
-            'common room', 'study room issue',
-            
-            # General complaint phrases
-            'complain', 'complaint', 'problem', 'issue', 'broken',
-            'not working', 'malfunctioning', 'damaged', 'faulty'
-        ]
-        
-        message_lower = message.lower()
-        return any(keyword in message_lower for keyword in complaint_keywords)
+        return _COMPLAINT_RE.search(message.lower()) is not None
     
     def get_complaint_category(self, message: str) -> str:
         """Categorize the complaint based on the message content."""
+        return self._category_for(message.lower())
+    
+    def classify_complaint(self, message: str) -> Tuple[bool, str]:
+        """Detect and categorize a complaint with one lowercasing; returns (False, "") for non-complaints."""
         message_lower = message.lower()
-        
-        if any(word in message_lower for word in ['fan', 'light', 'bulb', 'electricity', 'ac', 'air conditioner']):
-            return "Electrical"
-        elif any(word in message_lower for word in ['water', 'tap', 'plumbing', 'bathroom', 'toilet']):
-            return "Plumbing"
-        elif any(word in message_lower for word in ['wifi', 'internet', 'network']):
-            return "Internet/WiFi"
-        elif any(word in message_lower for word in ['food', 'mess', 'kitchen', 'hygiene']):
-            return "Mess/Food"
-        elif any(word in message_lower for word in ['cleaning', 'dirty', 'garbage', 'pest']):
-            return "Cleanliness"
-        elif any(word in message_lower for word in ['door', 'window', 'lock', 'paint', 'wall', 'ceiling']):
-            return "Infrastructure"
-        elif any(word in message_lower for word in ['noise', 'security', 'common room']):
-            return "Hostel Services"
-        else:
-            return "General"
+        if _COMPLAINT_RE.search(message_lower) is None:
+            return False, ""
+        return True, self._category_for(message_lower)
+    
+    def _category_for(self, message_lower: str) -> str:
+        """Return the highest-priority category with a keyword in the lowercased message."""
+        # Whole-word matching, so e.g. "ac" no longer fires inside "place"
+        tokens = frozenset(_TOKEN_RE.findall(message_lower))
+        for category, words, phrases in _CATEGORY_KEYWORDS:
+            if not words.isdisjoint(tokens) or any(phrase in message_lower for phrase in phrases):
+                return category
+        return "General"
     
-    def start_complaint_collection(self, user_session: str, complaint_text: str) -> Dict[str, Any]:
-        """Start collecting complaint details from the user."""
-        complaint_category = self.get_complaint_category(complaint_text)
+    def start_complaint_collection(self, complaint_text: str,
+                                   complaint_category: Optional[str] = None) -> Tuple[Dict, Dict[str, Any]]:
+        """
+        Start collecting complaint details from the user; pass the category if already known.
+        Returns (state, response); the caller keeps the state for the user's next step.
+        """
+        if complaint_category is None:
+            complaint_category = self.get_complaint_category(complaint_text)
         
-        self.complaint_states[user_session] = {
+        state = {
             'step': 'collect_name',
             'complaint_text': complaint_text,
             'category': complaint_category,
             'details': {}
         }
         
-        return {
+        # 'complaint_form' lets a UI offer a form for every field at once; the message itself
+        # works for callers without one
+        return state, {
+            'kind': 'complaint_form',
             'message': f"I'm sorry to hear about this {complaint_category.lower()} issue. I'll help you register a complaint. Let me collect some basic information first.\n\nPlease provide your full name:",
             'needs_input': True,
             'step': 'collect_name'
         }
     
-    def process_complaint_step(self, user_session: str, user_input: str) -> Dict[str, Any]:
-        """Process each step of complaint collection."""
-        if user_session not in self.complaint_states:
-            return {'message': "Please start by describing your complaint.", 'needs_input': True}
+    def process_complaint_step(self, state: Optional[Dict], user_input: str) -> Tuple[Optional[Dict], Dict[str, Any]]:
+        """
+        Process each step of complaint collection.
+        Returns (state, response); state is None once the complaint is complete.
+        """
+        if state is None:
+            return None, {'message': "Please start by describing your complaint.", 'needs_input': True}
         
-        state = self.complaint_states[user_session]
+        response = self._advance_complaint_step(state, user_input)
+        return (None if state['step'] == 'complete' else state), response
+    
+    def _advance_complaint_step(self, state: Dict, user_input: str) -> Dict[str, Any]:
+        """Record the answer to the current step in state and return the next prompt."""
         current_step = state['step']
         
         if current_step == 'collect_name':
@@ -136,23 +167,51 @@ class ComplaintHandler:
             state['step'] = 'complete'
             
             # Generate the complaint summary and next steps
-            return self._complete_complaint_collection(user_session)
+            return self._complete_complaint_collection(state)
+    
+    def submit_complaint_form(self, state: Optional[Dict], details: Dict[str, str]) -> Tuple[Optional[Dict], Dict[str, Any]]:
+        """
+        Complete the complaint from all contact details at once (name, email, phone, room_number).
+        Returns (state, response); invalid input keeps the state and asks for the form again.
+        """
+        if state is None:
+            return None, {'message': "Please start by describing your complaint.", 'needs_input': True}
+        
+        fields = {key: (details.get(key) or '').strip() for key in ('name', 'email', 'phone', 'room_number')}
+        missing = []
+        if not fields['name']:
+            missing.append("your full name")
+        if not self._validate_email(fields['email']):
+            missing.append("a valid email address")
+        if not self._validate_phone(fields['phone']):
+            missing.append("a valid 10-digit phone number")
+        if not fields['room_number']:
+            missing.append("your room number")
+        if missing:
+            return state, {
+                'kind': 'complaint_form',
+                'message': f"Please provide {', '.join(missing)}.",
+                'needs_input': True,
+                'step': state['step']
+            }
+        
+        state['details'] = fields
+        state['step'] = 'complete'
+        return None, self._complete_complaint_collection(state)
     
     def _validate_email(self, email: str) -> bool:
         """Validate email format."""
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        return bool(re.match(pattern, email))
+        return _EMAIL_RE.match(email) is not None
     
     def _validate_phone(self, phone: str) -> bool:
         """Validate phone number format."""
         # Remove any non-digit characters
-        phone_digits = re.sub(r'\D', '', phone)
+        phone_digits = _NON_DIGIT_RE.sub('', phone)
         # Check if it's 10 digits (Indian mobile) or 10 digits with country code
-        return len(phone_digits) >= 10 and len(phone_digits) <= 12
+        return 10 <= len(phone_digits) <= 12
     
-    def _complete_complaint_collection(self, user_session: str) -> Dict[str, Any]:
+    def _complete_complaint_collection(self, state: Dict) -> Dict[str, Any]:
         """Complete the complaint collection and provide next steps."""
-        state = self.complaint_states[user_session]
         details = state['details']
         
         # Prepare complaint summary
@@ -186,10 +245,8 @@ class ComplaintHandler:
         # Generate the pre-filled URL
         complaint_url = self._generate_complaint_url(state)
         
-        # Clean up the session
-        del self.complaint_states[user_session]
-        
         return {
+            'kind': 'complaint',
             'message': complaint_summary,
             'complaint_url': complaint_url,
             'needs_input': False,
@@ -209,60 +266,32 @@ class ComplaintHandler:
         
         # Based on common form field patterns and osTicket system
         # These are the most likely field names for the form
-        problem_summary = f"Room {details['room_number']} - {state['complaint_text']}"
-        
-        # Try multiple possible parameter combinations
-        # Common field names in osTicket and web forms
-        possible_params = [
-            # osTicket common field names
-            {
-                'email': details['email'],
-                'name': details['name'], 
-                'fullname': details['name'],
-                'phone': details['phone'],
-                'mobile': details['phone'],
-                'subject': problem_summary[:100],
-                'summary': problem_summary[:100],
-                'message': state['complaint_text'],
-                'issue': state['complaint_text'],
-                'location': f"Room {details['room_number']}",
-                'room': details['room_number']
-            },
-            # Alternative field names
-            {
-                'user_email': details['email'],
-                'user_name': details['name'],
-                'contact_phone': details['phone'],
-                'problem_summary': problem_summary[:100],
-                'problem_location': f"Room {details['room_number']}"
-            }
-        ]
-        
-        # Use the first set of parameters
-        params = possible_params[0]
-        
-        # Clean up None values and encode
-        clean_params = {k: v for k, v in params.items() if v is not None and v != ''}
-        
-        # Build the URL
-        base_url = self.complaint_base_url
-        query_string = urlencode(clean_params)
-        
-        return f"{base_url}?{query_string}"
+        problem_summary = f"Room {details['room_number']} - {state['complaint_text']}"[:100]
+        # Fixed field set, so only the values need quoting (same encoding as urlencode)
+        email = quote_plus(details['email'])
+        name = quote_plus(details['name'])
+        phone = quote_plus(details['phone'])
+        summary = quote_plus(problem_summary)
+        message = quote_plus(state['complaint_text'])
+        room = quote_plus(details['room_number'])
+        return (
+            f"{self.complaint_base_url}?email={email}&name={name}&fullname={name}"
+            f"&phone={phone}&mobile={phone}&subject={summary}&summary={summary}"
+            f"&message={message}&issue={message}&location=Room+{room}&room={room}"
+        )
     
-    def is_in_complaint_flow(self, user_session: str) -> bool:
+    def is_in_complaint_flow(self, state: Optional[Dict]) -> bool:
         """Check if user is currently in complaint collection flow."""
-        return user_session in self.complaint_states
+        return state is not None
     
-    def get_current_step(self, user_session: str) -> Optional[str]:
+    def get_current_step(self, state: Optional[Dict]) -> Optional[str]:
         """Get the current step in complaint collection."""
-        if user_session in self.complaint_states:
-            return self.complaint_states[user_session]['step']
+        if state is not None:
+            return state['step']
         return None
     
-    def cancel_complaint(self, user_session: str) -> str:
-        """Cancel the current complaint collection process."""
-        if user_session in self.complaint_states:
-            del self.complaint_states[user_session]
-            return "Complaint registration cancelled. How else can I help you?"
-        return "No active complaint registration to cancel."
+    def cancel_complaint(self, state: Optional[Dict]) -> Tuple[None, str]:
+        """Cancel the current complaint collection process; returns (cleared state, message)."""
+        if state is not None:
+            return None, "Complaint registration cancelled. How else can I help you?"
+        return None, "No active complaint registration to cancel."
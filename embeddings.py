@@ -0,0 +1,78 @@
+import functools
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List
+
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+class MicroBatchEmbeddings(Embeddings):
+    """
+    Coalesces concurrent embed_query calls into a single embed_documents batch.
+
+    Queries arriving within `window` seconds of each other (up to `max_batch`) share
+    one forward pass of the wrapped model. Assumes the wrapped model embeds queries
+    and documents the same way, as SentenceTransformerEmbeddings does.
+    """
+
+    def __init__(self, base: Embeddings, window: float = 0.01, max_batch: int = 16):
+        self.base = base
+        self.window = window
+        self.max_batch = max_batch
+        self._pending = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+        self._worker.start()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.base.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        future = Future()
+        self._pending.put((text, future))
+        return future.result()
+
+    def _run(self) -> None:
+        """Worker loop: wait for one query, gather any that follow within the window, embed them together."""
+        while True:
+            batch = [self._pending.get()]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._pending.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                vectors = self.base.embed_documents([text for text, _ in batch])
+            except Exception as e:
+                logger.error("Error embedding batch of %d queries: %s", len(batch), e)
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            for (_, future), vector in zip(batch, vectors):
+                future.set_result(vector)
+
+class CachedEmbeddings(Embeddings):
+    """LRU cache in front of embed_query, keyed by case- and whitespace-normalized text."""
+
+    def __init__(self, base: Embeddings, maxsize: int = 2048):
+        self.base = base
+        self._embed_normalized = functools.lru_cache(maxsize=maxsize)(self._embed)
+
+    def _embed(self, text: str) -> tuple:
+        # Stored as a tuple so callers can't mutate the cached vector
+        return tuple(self.base.embed_query(text))
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.base.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return list(self._embed_normalized(" ".join(text.lower().split())))
@@ -4,10 +4,13 @@ import logging
 import re
 from pathlib import Path
 
-# Set up logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+# Phrases that mark a question as a photo request
+_PHOTO_REQUEST_RE = re.compile(r"(photo|picture|image|pic|show me|look|view)")
+# Fallback terms for "show me the hostel"-style requests
+_HOSTEL_RE = re.compile(r"(hostel|building|campus)")
+
 class HostelPhotos:
     def __init__(self, photos_directory: str = "hostel_photos"):
         """Initialize the photos manager with a directory path."""
@@ -18,6 +21,15 @@ class HostelPhotos:
             "facilities": ["sports"],
             "exterior": ["building", "entrance", "garden"]
         }
+        # Single alternation over every category/subcategory name; each matched
+        # term maps back to its (category, subcategory) so one scan finds them all
+        self._term_targets = {}
+        for category, subcategories in self.photo_categories.items():
+            self._term_targets[category] = (category, None)
+            for subcategory in subcategories:
+                self._term_targets.setdefault(subcategory.replace("_", " "), (category, subcategory))
+        terms = sorted(self._term_targets, key=len, reverse=True)
+        self._term_re = re.compile("|".join(re.escape(term) for term in terms))
         
     def setup(self) -> bool:
         """Ensure the photos directory exists and is properly structured."""
@@ -37,7 +49,7 @@ class HostelPhotos:
             
             return True
         except Exception as e:
-            logger.error(f"Failed to setup photos directory structure: {str(e)}")
+            logger.error("Failed to setup photos directory structure: %s", e)
             return False
 
     def get_photo_paths(self, category: Optional[str] = None, subcategory: Optional[str] = None) -> List[str]:
@@ -74,9 +86,17 @@ class HostelPhotos:
             return photo_paths
             
         except Exception as e:
-            logger.error(f"Error getting photo paths: {str(e)}")
+            logger.error("Error getting photo paths: %s", e)
             return []
 
+    def mentions_photo_subject(self, text: str) -> bool:
+        """Return True if lowercased `text` names a photo category or subcategory (rooms, mess, ...)."""
+        return self._term_re.search(text) is not None
+
+    def may_want_photos(self, text: str) -> bool:
+        """Return True if lowercased `text` uses photo wording ("view", "look", ...) or names a photo subject."""
+        return _PHOTO_REQUEST_RE.search(text) is not None or self.mentions_photo_subject(text)
+
     def handle_photo_query(self, question: str) -> Optional[List[str]]:
         """
         Handle questions related to hostel photos.
@@ -86,34 +106,38 @@ class HostelPhotos:
             question_lower = question.lower()
             
             # Check if the question is asking for photos
-            photo_keywords = r"(photo|picture|image|pic|show me|look|view)"
-            if not re.search(photo_keywords, question_lower):
+            if not _PHOTO_REQUEST_RE.search(question_lower):
                 return None
-                
-            # Check for specific categories
+
+            # One pass over the question collects every category/subcategory mentioned
+            categories_found, subcategories_found = set(), set()
+            for match in self._term_re.finditer(question_lower):
+                category, subcategory = self._term_targets[match.group(0)]
+                if subcategory:
+                    subcategories_found.add((category, subcategory))
+                else:
+                    categories_found.add(category)
+
             photos_to_return = []
-            
             for category, subcategories in self.photo_categories.items():
-                if category in question_lower:
-                    # Check for specific subcategories
-                    for subcategory in subcategories:
-                        if subcategory.replace("_", " ") in question_lower:
-                            photos = self.get_photo_paths(category, subcategory)
-                            if photos:
-                                photos_to_return.extend(photos)
-                                
-                    # If no specific subcategory mentioned, get all category photos
-                    if not photos_to_return:
-                        photos_to_return.extend(self.get_photo_paths(category))
-                        
+                if category not in categories_found:
+                    continue
+                # Specific subcategories if any were mentioned, otherwise the whole category
+                wanted = [sub for sub in subcategories if (category, sub) in subcategories_found]
+                if wanted:
+                    for subcategory in wanted:
+                        photos_to_return.extend(self.get_photo_paths(category, subcategory))
+                else:
+                    photos_to_return.extend(self.get_photo_paths(category))
+
             # If no specific category found but asking for hostel photos
-            if not photos_to_return and re.search(r"(hostel|building|campus)", question_lower):
+            if not photos_to_return and _HOSTEL_RE.search(question_lower):
                 photos_to_return.extend(self.get_photo_paths())
             
             return photos_to_return if photos_to_return else None
             
         except Exception as e:
-            logger.error(f"Error handling photo query: {str(e)}")
+            logger.error("Error handling photo query: %s", e)
             return None
 
     def get_photos(self, category: str, subcategory: Optional[str] = None) -> List[str]:
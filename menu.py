@@ -1,104 +1,122 @@
+import csv
 from datetime import datetime
-import pandas as pd
 import logging
+import re
 from typing import Dict, List, Optional
 import pytz
 
-# Set up logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+# Lowercase day name -> canonical name used in the CSV, in weekly display order
+_DAYS = {
+    'sunday': 'Sunday',
+    'monday': 'Monday',
+    'tuesday': 'Tuesday',
+    'wednesday': 'Wednesday',
+    'thursday': 'Thursday',
+    'friday': 'Friday',
+    'saturday': 'Saturday'
+}
+_WORD_RE = re.compile(r"[a-z]+")
+
+# Meal slot -> (CSV column, display title)
+_MEAL_MAP = {
+    'morning': ('morning_menu', '🌅 Breakfast'),
+    'evening': ('evening_menu', '🌞 Lunch'),
+    'night': ('night_menu', '🌙 Dinner')
+}
+_DESSERT_MEALS = frozenset({'evening', 'night'})
+
+_CURRENT_MENU_TEMPLATE = "🕐 Current Time: {time}\n📅 {day}'s Menu\n\n{meal_title}:\n{menu}"
+_MEAL_MENU_TEMPLATE = "📅 {day}'s Menu\n\n{meal_title}:\n{menu}"
+_DAY_MENU_TEMPLATE = (
+    "📅 Menu for {day_of_week}:\n"
+    "🌅 Breakfast: {morning_menu}\n"
+    "🌞 Lunch: {evening_menu}\n"
+    "🌙 Dinner: {night_menu}"
+)
+
 class MessMenu:
     def __init__(self):
         logger.debug("Initializing MessMenu")
-        # Read CSV file into DataFrame
-        self.df = pd.read_csv('data/mess_menu.csv')
+        # Read the CSV into a day name -> row mapping
+        with open('data/mess_menu.csv', newline='', encoding='utf-8') as f:
+            self.menu = {row['day_of_week']: row for row in csv.DictReader(f)}
         self.meal_times = {
             'morning': (5, 10),    # 5 AM to 10 AM
             'evening': (11, 16),   # 11 AM to 4 PM
             'night': (17, 23)      # 5 PM to 11 PM
         }
-        logger.debug(f"Loaded menu data with {len(self.df)} rows")
+        # Hour of day -> meal slot; hours outside every slot default to morning
+        self._hour_to_meal = ['morning'] * 24
+        for meal_type, (start_hour, end_hour) in self.meal_times.items():
+            for hour in range(start_hour, end_hour + 1):
+                self._hour_to_meal[hour] = meal_type
+        self._ist = pytz.timezone('Asia/Kolkata')
+        # The CSV doesn't change at runtime, so the day and week menu texts are built once
+        self._day_menu_texts = {day: self._format_day_menu(row) for day, row in self.menu.items()}
+        weekly_menu = self.get_full_week_menu()
+        self._week_menu_text = (self.format_full_menu(weekly_menu) if weekly_menu
+                                else "Sorry, I couldn't retrieve the weekly menu.")
+        logger.debug("Loaded menu data with %d rows", len(self.menu))
     
     def get_menu_for_day(self, day_of_week: str) -> Optional[Dict]:
         """Fetch the menu for a specific day."""
-        logger.debug(f"Fetching menu for {day_of_week}")
-        try:
-            menu = self.df[self.df['day_of_week'] == day_of_week]
-            if not menu.empty:
-                result = menu.iloc[0].to_dict()
-                logger.debug(f"Menu found for {day_of_week}: {result}")
-                return result
-            else:
-                logger.debug(f"No menu found for {day_of_week}")
-                return None
-        except Exception as e:
-            logger.error(f"Error fetching menu for {day_of_week}: {e}")
-            return None
+        logger.debug("Fetching menu for %s", day_of_week)
+        result = self.menu.get(day_of_week)
+        if result is None:
+            logger.debug("No menu found for %s", day_of_week)
+        return result
 
     def get_full_week_menu(self) -> Optional[List[Dict]]:
         logger.debug("Fetching full week menu")
-        try:
-            day_order = ['Sunday', 'Monday', 'Tuesday', 'Wednesday', 
-                        'Thursday', 'Friday', 'Saturday']
-            sorted_df = self.df.set_index('day_of_week').loc[day_order].reset_index()
-            result = sorted_df.to_dict('records')
-            logger.debug(f"Retrieved {len(result)} days of menu data")
-            return result
-        except Exception as e:
-            logger.error(f"Error fetching weekly menu: {e}")
-            return None
+        result = [self.menu[day] for day in _DAYS.values() if day in self.menu]
+        logger.debug("Retrieved %d days of menu data", len(result))
+        return result
 
     def get_current_menu(self) -> str:
         logger.debug("Getting current menu")
-        ist = pytz.timezone('Asia/Kolkata')
-        current_time = datetime.now(ist)
+        current_time = datetime.now(self._ist)
         current_day = current_time.strftime('%A')
-        current_meal = self.get_current_meal_time()
+        current_meal = self.get_current_meal_time(current_time.hour)
         
-        logger.debug(f"Current day: {current_day}, Current meal time: {current_meal}")
+        logger.debug("Current day: %s, Current meal time: %s", current_day, current_meal)
         
         menu_data = self.get_menu_for_day(current_day)
         if not menu_data:
             logger.error("Failed to retrieve menu data")
             return "Sorry, I couldn't retrieve the menu at the moment."
 
-        meal_map = {
-            'morning': ('morning_menu', '🌅 Breakfast'),
-            'evening': ('evening_menu', '🌞 Lunch'),
-            'night': ('night_menu', '🌙 Dinner')
-        }
-
-        menu_key, meal_title = meal_map[current_meal]
+        menu_key, meal_title = _MEAL_MAP[current_meal]
         
-        response = [
-            f"🕐 Current Time: {current_time.strftime('%I:%M %p')}",
-            f"📅 {current_day}'s Menu\n",
-            f"{meal_title}:",
-            f"{menu_data[menu_key]}"
-        ]
-
-        if menu_data['dessert'] != 'OFF' and current_meal in ['evening', 'night']:
-            response.append(f"\n🍨 Dessert: {menu_data['dessert']}")
-
-        final_response = "\n".join(response)
-        logger.debug(f"Generated menu response: {final_response}")
+        final_response = _CURRENT_MENU_TEMPLATE.format(
+            time=current_time.strftime('%I:%M %p'),
+            day=current_day,
+            meal_title=meal_title,
+            menu=menu_data[menu_key]
+        )
+
+        if menu_data['dessert'] != 'OFF' and current_meal in _DESSERT_MEALS:
+            final_response += f"\n\n🍨 Dessert: {menu_data['dessert']}"
+
+        logger.debug("Generated menu response: %s", final_response)
         return final_response
 
-    def get_current_meal_time(self) -> str:
-        ist = pytz.timezone('Asia/Kolkata')
-        current_hour = datetime.now(ist).hour
-        logger.debug(f"Current hour: {current_hour}")
-        
-        for meal_type, (start_hour, end_hour) in self.meal_times.items():
-            if start_hour <= current_hour <= end_hour:
-                logger.debug(f"Current meal time: {meal_type}")
-                return meal_type
-        
-        logger.debug("Outside regular meal times, defaulting to morning")
-        return 'morning'
+    def get_current_meal_time(self, current_hour: Optional[int] = None) -> str:
+        if current_hour is None:
+            current_hour = datetime.now(self._ist).hour
+        return self._hour_to_meal[current_hour]
 
-    def format_full_menu(self, weekly_menu: List[Dict]) -> str:
+    @staticmethod
+    def _format_day_menu(day_menu: Dict) -> str:
+        """Formats one day's menu row into a readable string."""
+        response = _DAY_MENU_TEMPLATE.format_map(day_menu)
+        if day_menu['dessert'] != 'OFF':
+            response += f"\n🍨 Dessert: {day_menu['dessert']}"
+        return response
+
+    @staticmethod
+    def format_full_menu(weekly_menu: List[Dict]) -> str:
         """Formats the full weekly menu into a readable string."""
         response = ["📅 Here is the full weekly menu:\n"]
         for day_menu in weekly_menu:
@@ -110,6 +128,31 @@ class MessMenu:
                 response.append(f"🍨 Dessert: {day_menu['dessert']}")
         return "\n".join(response)
 
+    def find_day(self, text: str) -> Optional[str]:
+        """Return the day of the week named in the text (e.g. "monday's menu" -> 'Monday'), if any."""
+        return next((_DAYS[word] for word in _WORD_RE.findall(text.lower()) if word in _DAYS), None)
+
+    def get_meal_menu(self, day: str, meal: Optional[str] = None) -> str:
+        """
+        Menu for one meal slot ('morning', 'evening' or 'night') on `day` ('today' or a weekday name).
+        Without a meal, returns the whole day's menu.
+        """
+        if day.lower() == 'today':
+            day_found = datetime.now(self._ist).strftime('%A')
+        else:
+            day_found = self.find_day(day)
+        menu_data = self.get_menu_for_day(day_found) if day_found else None
+        if not menu_data:
+            return f"Sorry, I couldn't find a menu for '{day}'."
+        if meal is None:
+            return self._day_menu_texts[day_found]
+
+        menu_key, meal_title = _MEAL_MAP[meal]
+        response = _MEAL_MENU_TEMPLATE.format(day=day_found, meal_title=meal_title, menu=menu_data[menu_key])
+        if menu_data['dessert'] != 'OFF' and meal in _DESSERT_MEALS:
+            response += f"\n\n🍨 Dessert: {menu_data['dessert']}"
+        return response
+
     def get_menu(self, day: Optional[str] = None) -> str:
         """
         A tool to get the hostel mess menu.
@@ -124,23 +167,12 @@ class MessMenu:
         day_lower = day.lower()
 
         if day_lower == 'week':
-            weekly_menu = self.get_full_week_menu()
-            if weekly_menu:
-                return self.format_full_menu(weekly_menu)
-            return "Sorry, I couldn't retrieve the weekly menu."
-
-        # Handle specific day
-        day_capitalized = day_lower.capitalize()
-        day_menu = self.get_menu_for_day(day_capitalized)
-        if day_menu:
-            response = [
-                f"📅 Menu for {day_menu['day_of_week']}:",
-                f"🌅 Breakfast: {day_menu['morning_menu']}",
-                f"🌞 Lunch: {day_menu['evening_menu']}",
-                f"🌙 Dinner: {day_menu['night_menu']}"
-            ]
-            if day_menu['dessert'] != 'OFF':
-                response.append(f"🍨 Dessert: {day_menu['dessert']}")
-            return "\n".join(response)
+            return self._week_menu_text
+
+        # Handle specific day - pick the first word that names a day (e.g. "monday menu")
+        day_found = self.find_day(day_lower)
+        day_menu_text = self._day_menu_texts.get(day_found) if day_found else None
+        if day_menu_text:
+            return day_menu_text
         
         return f"Sorry, I couldn't find a menu for '{day}'."
\ No newline at end of file
@@ -1,12 +1,21 @@
 import streamlit as st
 import warnings
+import logging
 from config import load_config
 from chatbot import AryaChatbot
 import gc
 import functools
+from collections import deque
+from itertools import islice
 from PIL import Image
 import os
 
+# Application-wide logging; library modules only create their own loggers
+logging.basicConfig(level=logging.INFO)
+
+# Chat turns kept per session to prevent memory bloat
+_MAX_CHAT_HISTORY = 50
+
 # Cache decorators remain the same
 @st.cache_data
 def cached_load_config():
@@ -31,15 +40,17 @@ def initialize_chatbot(config):
         st.error(f"Full error details: {traceback.format_exc()}")
         return None
 
-@st.cache_data(max_entries=100, ttl=3600)
-def get_cached_response(question: str, user_session_id: str) -> str:
-    """Cache chatbot responses to reduce API calls and computation."""
+def get_chatbot_response(question: str, user_session_id: str) -> str:
+    """
+    Ask the chatbot. Not cached here: the chatbot keeps its own cache of shareable
+    knowledge-base answers, while menu and complaint replies depend on time and session.
+    """
     chatbot = st.session_state.chatbot
     if chatbot is None:
         raise ValueError("Chatbot not initialized")
     
     try:
-        return chatbot.get_response(question, user_session_id)
+        return chatbot.get_response(question, user_session_id, session_state=st.session_state)
     except Exception as e:
         # Clear cache on LLM errors to force reinitialization
         if "max_length" in str(e) or "InferenceClient" in str(e):
@@ -52,75 +63,133 @@ def init_session_state():
     if "chatbot" not in st.session_state:
         st.session_state.chatbot = None
     if "chat_history" not in st.session_state:
-        st.session_state.chat_history = []
+        # Bounded, so appends evict the oldest turn once the limit is reached
+        st.session_state.chat_history = deque(maxlen=_MAX_CHAT_HISTORY)
     if "user_input" not in st.session_state:
         st.session_state.user_input = ""
+    # The user's in-progress complaint lives here rather than in the shared, cached chatbot
+    st.session_state.setdefault("complaint_flow", None)
     if "user_session_id" not in st.session_state:
         import uuid
         st.session_state.user_session_id = str(uuid.uuid4())
 
 def clear_chat_history():
     """Clear chat history and session state."""
-    st.session_state.chat_history = []
-    get_cached_response.clear()
+    st.session_state.chat_history.clear()
     gc.collect()
 
-def manage_chat_history(history, max_length=50):
-    """Manage chat history length to prevent memory bloat."""
-    if len(history) > max_length:
-        history = history[-max_length:]
-    return history
+# Photos are shown in a 3-column grid, so anything larger only adds decode and transfer time
+_THUMBNAIL_SIZE = (512, 512)
+
+@st.cache_data(max_entries=200)
+def load_thumbnail(path: str, mtime: float):
+    """Load a downscaled copy of an image; mtime is part of the cache key so edited files reload."""
+    with Image.open(path) as img:
+        img.thumbnail(_THUMBNAIL_SIZE, Image.Resampling.BILINEAR)
+        return img.copy()
 
 def display_images(photo_paths):
     """Display images in a grid layout."""
     try:
         cols = st.columns(min(3, len(photo_paths)))
         for idx, path in enumerate(photo_paths):
-            if os.path.exists(path):
-                try:
-                    with Image.open(path) as img:
-                        cols[idx % 3].image(img, caption=f"Image {idx + 1}", use_container_width=True)
-                except Exception as e:
-                    cols[idx % 3].error(f"Error loading image: {str(e)}")
-            else:
+            try:
+                mtime = os.path.getmtime(path)
+            except OSError:
                 cols[idx % 3].error(f"Image not found: {path}")
+                continue
+            try:
+                thumbnail = load_thumbnail(path, mtime)
+                cols[idx % 3].image(thumbnail, caption=f"Image {idx + 1}", use_container_width=True)
+            except Exception as e:
+                cols[idx % 3].error(f"Error loading image: {str(e)}")
     except Exception as e:
         st.error(f"Error displaying images: {str(e)}")
 
+def _photos_result(response):
+    """Chat history fields for a photo response."""
+    return {'response': response.get("text") or "Here are the photos you requested:", 'photos': response["photos"]}
+
+def _complaint_result(response):
+    """Chat history fields for a completed complaint, including the portal link and details."""
+    result = {
+        'response': response["message"],
+        'complaint_url': response["complaint_url"],
+        'is_complaint': True
+    }
+    for key in ('user_details', 'complaint_info'):
+        if key in response:
+            result[key] = response[key]
+    return result
+
+def _complaint_form_result(response):
+    """Chat history fields for a complaint step that the form below the chat can answer."""
+    return {'response': f"{response['message']}\n\n📝 You can also fill in the complaint form below."}
+
+def _text_result(response):
+    """Chat history fields for a plain text (or complaint step) response."""
+    return {'response': response.get("text") or response.get("message") or str(response)}
+
+# Response "kind" set by the chatbot -> chat history builder; responses without one are text
+_RESULT_BUILDERS = {
+    "photos": _photos_result,
+    "complaint": _complaint_result,
+    "complaint_form": _complaint_form_result,
+    "text": _text_result
+}
+
+def handle_complaint_form():
+    """Submit every complaint form field to the chatbot in one call."""
+    chatbot = st.session_state.chatbot
+    if chatbot is None:
+        st.error("Chatbot not initialized")
+        return
+    details = {
+        'name': st.session_state.get("complaint_name", ""),
+        'email': st.session_state.get("complaint_email", ""),
+        'phone': st.session_state.get("complaint_phone", ""),
+        'room_number': st.session_state.get("complaint_room", "")
+    }
+    try:
+        response = chatbot.submit_complaint_form(
+            details, st.session_state.user_session_id, session_state=st.session_state
+        )
+        result = {'question': "📝 Submitted the complaint form"}
+        # Missing-field replies come straight from the form, so they don't point back at it
+        kind = response.get("kind")
+        build_result = _text_result if kind == "complaint_form" else _RESULT_BUILDERS.get(kind, _text_result)
+        result.update(build_result(response))
+        st.session_state.chat_history.append(result)
+    except Exception as e:
+        st.error(f"Error submitting your complaint: {str(e)}")
+
+def render_complaint_form():
+    """Show a form for all complaint details while a complaint is being registered."""
+    with st.form(key='complaint_form'):
+        st.markdown("**📝 Complaint details**")
+        st.text_input("Full Name", key="complaint_name")
+        st.text_input("College Email", key="complaint_email", placeholder="you@ietlucknow.ac.in")
+        st.text_input("Phone Number", key="complaint_phone", max_chars=15)
+        st.text_input("Room Number", key="complaint_room")
+        st.form_submit_button("Submit Complaint", on_click=handle_complaint_form)
+
 def handle_input():
     """Handle the submission of user input."""
     if st.session_state.user_input.strip():
         user_question = st.session_state.user_input
         try:
             with st.spinner('Processing your question...'):
-                response = get_cached_response(user_question, st.session_state.user_session_id)
+                response = get_chatbot_response(user_question, st.session_state.user_session_id)
                 result = {'question': user_question}
                 
                 # Handle different response types
                 if isinstance(response, dict):
-                    if "photos" in response:
-                        result['response'] = "Here are the photos you requested:"
-                        result['photos'] = response["photos"]
-                    elif "complaint_url" in response:
-                        # Handle complaint responses
-                        result['response'] = response["message"]
-                        result['complaint_url'] = response["complaint_url"]
-                        result['is_complaint'] = True
-                        if 'user_details' in response:
-                            result['user_details'] = response['user_details']
-                        if 'complaint_info' in response:
-                            result['complaint_info'] = response['complaint_info']
-                    elif "text" in response:
-                        result['response'] = response["text"]
-                    elif "message" in response:
-                        result['response'] = response["message"]
-                    else:
-                        result['response'] = str(response)
+                    build_result = _RESULT_BUILDERS.get(response.get("kind"), _text_result)
+                    result.update(build_result(response))
                 else:
                     result['response'] = response if isinstance(response, str) else str(response)
                 
                 st.session_state.chat_history.append(result)
-                st.session_state.chat_history = manage_chat_history(st.session_state.chat_history)
                 
         except Exception as e:
             st.error(f"Error processing your question: {str(e)}")
@@ -175,7 +244,7 @@ def main():
         # Display chat history ABOVE the input box (newest first)
         if st.session_state.chat_history:
             st.write("### Recent Conversations")
-            for chat in reversed(st.session_state.chat_history[-5:]):
+            for chat in islice(reversed(st.session_state.chat_history), 5):
                 with st.container():
                     st.write(f"**You:** {chat['question']}")
                     st.write(f"**ARYA:** {chat['response']}")
@@ -208,6 +277,10 @@ Category: {info['category']}""")
                     
                     st.markdown("---")
 
+        # One form instead of a chat turn per detail while a complaint is in progress
+        if st.session_state.complaint_flow is not None:
+            render_complaint_form()
+
         # Create input form AT THE BOTTOM
         with st.form(key='chat_form', clear_on_submit=True):
             user_input = st.text_input(